@@ -0,0 +1,265 @@
+# Deterministic, Gemini-compatible LLM stub for offline development and load testing.
+#
+#   uvicorn llm_stub:app --port 8090
+#   GEMINI_API_KEY=stub GEMINI_API_URL=http://127.0.0.1:8090/v1beta/models/gemini-2.5-flash:generateContent \
+#       uvicorn main:app
+#
+# Behaviour is configured through environment variables:
+#   STUB_LATENCY        fixed:<s> | uniform:<lo>,<hi> | normal:<mean>,<stddev> | lognormal:<mu>,<sigma> | exponential:<mean>
+#   STUB_ERROR_RATE     fraction of calls answered with a 429/500/503 error (default 0)
+#   STUB_TRUNCATE_RATE  fraction of calls cut short with finishReason MAX_TOKENS (default 0)
+#   STUB_STREAM_CHUNKS  number of chunks streamGenerateContent splits a response into (default 8)
+#   STUB_RESPONSES_FILE JSON object of {"prompt substring": "canned response text"} checked first
+#   STUB_SEED           seed mixed into every per-prompt random generator (default 0)
+#
+# The same prompt always gets the same response, latency sample and error decision.
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+logging.basicConfig(level=logging.INFO)
+
+STUB_LATENCY = os.getenv("STUB_LATENCY", "lognormal:-1.2,0.5")
+STUB_ERROR_RATE = float(os.getenv("STUB_ERROR_RATE", "0"))
+STUB_TRUNCATE_RATE = float(os.getenv("STUB_TRUNCATE_RATE", "0"))
+STUB_STREAM_CHUNKS = int(os.getenv("STUB_STREAM_CHUNKS", "8"))
+STUB_RESPONSES_FILE = os.getenv("STUB_RESPONSES_FILE")
+STUB_SEED = os.getenv("STUB_SEED", "0")
+
+ERROR_STATUSES = (429, 500, 503)
+CONTINUATION_MARKER = "\n\nYour previous response was cut off. It ended with:\n"
+CONTEXT_RE = re.compile(r"following documentation context:\n\n(.*?)\n\nUser query:\n(.*?)\n\n", re.DOTALL)
+PAGE_LOCATORS_RE = re.compile(r"Known page locators[^\n]*\n(.*?)\n\n", re.DOTALL)
+TITLE_RE = re.compile(r"Test case title: (.*)")
+
+app = FastAPI(title="Gemini LLM Stub")
+
+
+def parse_latency(spec: str):
+    """
+    Build a sampler (rng -> seconds) from a STUB_LATENCY spec.
+    """
+    kind, _, raw_args = spec.partition(":")
+    args = [float(arg) for arg in raw_args.split(",") if arg.strip()]
+    samplers = {
+        "fixed": lambda rng: args[0],
+        "uniform": lambda rng: rng.uniform(args[0], args[1]),
+        "normal": lambda rng: rng.gauss(args[0], args[1]),
+        "lognormal": lambda rng: rng.lognormvariate(args[0], args[1]),
+        "exponential": lambda rng: rng.expovariate(1.0 / args[0]),
+    }
+    if kind not in samplers:
+        raise ValueError(f"Unknown STUB_LATENCY distribution: {kind!r}")
+    return lambda rng: max(0.0, samplers[kind](rng))
+
+
+sample_latency = parse_latency(STUB_LATENCY)
+
+
+def load_canned_responses(path: Optional[str]) -> Dict[str, str]:
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+CANNED_RESPONSES = load_canned_responses(STUB_RESPONSES_FILE)
+
+
+def prompt_rng(prompt: str, salt: str = "") -> random.Random:
+    digest = hashlib.sha256(f"{STUB_SEED}:{salt}:{prompt}".encode()).hexdigest()
+    return random.Random(int(digest[:16], 16))
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _sentences(text: str) -> List[str]:
+    parts = re.split(r"(?<=[.!?])\s+|\n+", text)
+    return [part.strip(" -#*") for part in parts if len(part.strip(" -#*")) > 12]
+
+
+def render_test_cases(prompt: str, rng: random.Random) -> str:
+    """
+    Templated test cases: one positive and one negative case per retrieved context sentence.
+    """
+    match = CONTEXT_RE.search(prompt)
+    context, query = (match.group(1), match.group(2).strip()) if match else ("", "the feature")
+    sentences = _sentences(context) or [f"Behaviour described by: {query}"]
+    rng.shuffle(sentences)
+
+    test_cases = []
+    for sentence in sentences[: rng.randint(3, 6)]:
+        summary = sentence[:80].rstrip(".")
+        for kind in ("Positive", "Negative"):
+            expectation = "behaves as specified" if kind == "Positive" else "rejects invalid input with an error"
+            test_cases.append({
+                "id": f"TC-{len(test_cases) + 1:03d}",
+                "title": f"{kind}: {summary}",
+                "description": f"For '{query}', verify the system {expectation}: {sentence}",
+                "grounded_in": ["retrieved_context"],
+            })
+    return json.dumps(test_cases, indent=2)
+
+
+def render_action_plan(prompt: str, rng: random.Random) -> str:
+    """
+    Templated Selenium plan built from the page locators listed in the prompt.
+    """
+    locators: List[Tuple[str, str]] = []
+    match = PAGE_LOCATORS_RE.search(prompt)
+    if match:
+        for line in match.group(1).splitlines():
+            _, _, entries = line.partition(": ")
+            for entry in entries.split(", "):
+                locator_type, sep, value = entry.partition("=")
+                if sep:
+                    locators.append((locator_type, value))
+
+    title = TITLE_RE.search(prompt)
+    text = title.group(1).strip()[:40] if title else "Success"
+    actions, assertions = [], []
+    for locator_type, value in rng.sample(locators, min(len(locators), 4)):
+        is_button = any(word in value.lower() for word in ("btn", "button", "submit"))
+        action = {"type": "click" if is_button else "input", "locator_type": locator_type, "locator_value": value}
+        if not is_button:
+            action["value"] = rng.choice(["SAVE15", "test@example.com", "Jane Doe", "1", ""])
+        actions.append(action)
+    if locators:
+        locator_type, value = locators[-1]
+        assertions.append({"type": "element_visible", "locator_type": locator_type, "locator_value": value})
+    assertions.append({"type": "title_contains", "text": text.split(" ")[0]})
+    return json.dumps({"actions": actions, "assertions": assertions}, indent=2)
+
+
+def render_response(prompt: str) -> str:
+    original, marker, tail = prompt.partition(CONTINUATION_MARKER)
+    if marker:
+        # Continuation request: return what follows the partial output in the full response.
+        # Checked before canned responses, whose needles would also match the repeated prompt.
+        full = render_response(original)
+        seen = tail.split("\n\nContinue the JSON", 1)[0]
+        index = full.find(seen)
+        return full[index + len(seen):] if index >= 0 else full
+
+    for needle, response in CANNED_RESPONSES.items():
+        if needle in original:
+            return response
+
+    rng = prompt_rng(prompt, "response")
+    if '"actions"' in prompt:
+        return render_action_plan(prompt, rng)
+    return render_test_cases(prompt, rng)
+
+
+def gemini_payload(text: str, prompt: str, finish_reason: str = "STOP") -> Dict[str, Any]:
+    return {
+        "candidates": [{
+            "content": {"parts": [{"text": text}], "role": "model"},
+            "finishReason": finish_reason,
+            "index": 0,
+        }],
+        "usageMetadata": {
+            "promptTokenCount": estimate_tokens(prompt),
+            "candidatesTokenCount": estimate_tokens(text),
+            "totalTokenCount": estimate_tokens(prompt) + estimate_tokens(text),
+        },
+    }
+
+
+def extract_prompt(body: Dict[str, Any]) -> str:
+    return "".join(
+        part.get("text", "")
+        for content in body.get("contents", [])
+        for part in content.get("parts", [])
+    )
+
+
+def plan_call(prompt: str) -> Tuple[float, Optional[int], str, str]:
+    """
+    Decide latency, error status, response text and finish reason for a prompt.
+    """
+    rng = prompt_rng(prompt, "call")
+    latency = sample_latency(rng)
+    if rng.random() < STUB_ERROR_RATE:
+        return latency, rng.choice(ERROR_STATUSES), "", "ERROR"
+
+    text = render_response(prompt)
+    if CONTINUATION_MARKER not in prompt and rng.random() < STUB_TRUNCATE_RATE:
+        return latency, None, text[: max(1, int(len(text) * rng.uniform(0.3, 0.8)))], "MAX_TOKENS"
+    return latency, None, text, "STOP"
+
+
+def error_response(status: int) -> JSONResponse:
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"code": status, "message": "Injected stub error", "status": "UNAVAILABLE"}},
+    )
+
+
+@app.get("/")
+def read_root():
+    return {
+        "message": "Gemini LLM stub is running",
+        "latency": STUB_LATENCY,
+        "error_rate": STUB_ERROR_RATE,
+        "truncate_rate": STUB_TRUNCATE_RATE,
+    }
+
+
+@app.post("/v1beta/models/{model_action}")
+async def generate(model_action: str, request: Request):
+    model, _, action = model_action.partition(":")
+    body = await request.json()
+    prompt = extract_prompt(body)
+    latency, error_status, text, finish_reason = plan_call(prompt)
+
+    if action == "generateContent":
+        await asyncio.sleep(latency)
+        if error_status:
+            return error_response(error_status)
+        return gemini_payload(text, prompt, finish_reason)
+
+    if action == "streamGenerateContent":
+        if error_status:
+            await asyncio.sleep(latency)
+            return error_response(error_status)
+        return stream_response(text, prompt, finish_reason, latency, sse=request.query_params.get("alt") == "sse")
+
+    return JSONResponse(status_code=404, content={"error": {"code": 404, "message": f"Unknown action {action!r}"}})
+
+
+def stream_response(text: str, prompt: str, finish_reason: str, latency: float, sse: bool) -> StreamingResponse:
+    """
+    Stream the response in STUB_STREAM_CHUNKS pieces spread over the sampled latency.
+    """
+    chunk_count = max(1, STUB_STREAM_CHUNKS)
+    size = max(1, -(-len(text) // chunk_count))
+    pieces = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+    async def chunks():
+        if not sse:
+            yield "["
+        for i, piece in enumerate(pieces):
+            await asyncio.sleep(latency / len(pieces))
+            last = i == len(pieces) - 1
+            payload = gemini_payload(piece, prompt, finish_reason)
+            if not last:
+                payload["candidates"][0].pop("finishReason")
+            data = json.dumps(payload)
+            if sse:
+                yield f"data: {data}\r\n\r\n"
+            else:
+                yield data + ("]" if last else ",\n")
+
+    return StreamingResponse(chunks(), media_type="text/event-stream" if sse else "application/json")
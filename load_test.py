@@ -0,0 +1,184 @@
+# Async load-test harness for the QA agent backend.
+#
+# Run the backend against the LLM stub (see llm_stub.py), then:
+#   python load_test.py --base-url http://127.0.0.1:8000 --concurrency 16 --duration 60
+#
+# Uploads checkout.html and the sample docs, builds the knowledge base once, then
+# drives a weighted mix of endpoints and reports throughput and tail latency per endpoint.
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+import httpx
+
+SAMPLE_DOCS = ["product_specs.md", "ui_ux_guide.txt", "api_endpoints.json"]
+SAMPLE_HTML = ["checkout.html"]
+
+QUERIES = [
+    "Generate all positive and negative test cases for the discount code feature.",
+    "Test cases for form validation errors on name, email and address.",
+    "Test cases for shipping method selection and its effect on total price.",
+    "Test cases for the Pay Now button and payment success message.",
+    "Test cases for cart quantity updates and subtotal calculation.",
+]
+
+SELENIUM_CASES = [
+    ("Apply valid discount code SAVE15", "Enter SAVE15 in the discount code field and verify the discount amount."),
+    ("Submit order with missing email", "Leave email empty, click Pay Now and verify the email error is shown."),
+    ("Select express shipping", "Choose express shipping and verify shipping cost is $10."),
+]
+
+Scenario = Callable[[httpx.AsyncClient, random.Random], Awaitable[httpx.Response]]
+
+
+def _generate_test_cases(client: httpx.AsyncClient, rng: random.Random):
+    return client.post("/generate-test-cases/", json={"user_query": rng.choice(QUERIES)})
+
+
+def _generate_selenium_script(client: httpx.AsyncClient, rng: random.Random):
+    title, description = rng.choice(SELENIUM_CASES)
+    return client.get(
+        "/generate-selenium-script/",
+        params={"test_case_title": title, "test_case_description": description},
+    )
+
+
+def _suite_support(client: httpx.AsyncClient, rng: random.Random):
+    return client.get("/generate-suite-support/")
+
+
+def _metrics(client: httpx.AsyncClient, rng: random.Random):
+    return client.get("/metrics")
+
+
+def _root(client: httpx.AsyncClient, rng: random.Random):
+    return client.get("/")
+
+
+# endpoint name -> (weight, request builder)
+SCENARIOS: Dict[str, Tuple[int, Scenario]] = {
+    "generate-test-cases": (50, _generate_test_cases),
+    "generate-selenium-script": (30, _generate_selenium_script),
+    "generate-suite-support": (10, _suite_support),
+    "metrics": (5, _metrics),
+    "root": (5, _root),
+}
+
+
+async def setup(client: httpx.AsyncClient, data_dir: str) -> None:
+    """
+    Upload the sample files and build the knowledge base once before the run.
+    """
+    uploaded_docs, uploaded_html = [], []
+    for filename in SAMPLE_DOCS + SAMPLE_HTML:
+        path = os.path.join(data_dir, filename)
+        if not os.path.exists(path):
+            print(f"Skipping missing sample file: {path}")
+            continue
+        kind = "html" if filename in SAMPLE_HTML else "documentation"
+        with open(path, "rb") as f:
+            resp = await client.post(f"/upload/{kind}/", files={"file": (filename, f.read())})
+        resp.raise_for_status()
+        (uploaded_html if kind == "html" else uploaded_docs).append(filename)
+
+    resp = await client.post(
+        "/build-knowledge-base/",
+        json={"documentation_filenames": uploaded_docs, "html_filenames": uploaded_html},
+        timeout=600,
+    )
+    resp.raise_for_status()
+    print(f"Knowledge base ready: {resp.json()}")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, List[float]]]:
+    names = list(SCENARIOS)
+    weights = [SCENARIOS[name][0] for name in names]
+    results: Dict[str, Dict[str, List[float]]] = {name: {"ok": [], "error": []} for name in names}
+    counter = itertools.count()
+    deadline = time.perf_counter() + args.duration if args.duration else None
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        if not args.skip_setup:
+            await setup(client, args.data_dir)
+
+        async def worker(worker_id: int) -> None:
+            rng = random.Random(args.seed + worker_id)
+            while True:
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return
+                if deadline is None and next(counter) >= args.requests:
+                    return
+                name = rng.choices(names, weights=weights)[0]
+                started = time.perf_counter()
+                try:
+                    resp = await SCENARIOS[name][1](client, rng)
+                    outcome = "ok" if resp.status_code < 400 else "error"
+                except httpx.HTTPError:
+                    outcome = "error"
+                results[name][outcome].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+        args.elapsed = time.perf_counter() - started
+    return results
+
+
+def report(results: Dict[str, Dict[str, List[float]]], elapsed: float) -> None:
+    header = f"{'endpoint':<26}{'reqs':>7}{'errors':>8}{'rps':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+    print(header)
+    print("-" * len(header))
+    all_latencies: List[float] = []
+    total_errors = 0
+    for name, outcome in results.items():
+        latencies = sorted(outcome["ok"] + outcome["error"])
+        if not latencies:
+            continue
+        all_latencies.extend(latencies)
+        total_errors += len(outcome["error"])
+        print(_row(name, latencies, len(outcome["error"]), elapsed))
+    print("-" * len(header))
+    print(_row("TOTAL", sorted(all_latencies), total_errors, elapsed))
+    if all_latencies:
+        print(f"mean latency: {statistics.mean(all_latencies) * 1000:.1f} ms over {elapsed:.1f} s")
+
+
+def _row(name: str, latencies: List[float], errors: int, elapsed: float) -> str:
+    ms = [value * 1000 for value in latencies]
+    return (
+        f"{name:<26}{len(ms):>7}{errors:>8}{len(ms) / elapsed:>8.1f}"
+        f"{percentile(ms, 50):>9.1f}{percentile(ms, 95):>9.1f}{percentile(ms, 99):>9.1f}{(ms[-1] if ms else 0):>9.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the Autonomous QA Agent backend.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="Total requests (ignored with --duration)")
+    parser.add_argument("--duration", type=float, default=0, help="Run for this many seconds instead")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=os.path.dirname(os.path.abspath(__file__)))
+    parser.add_argument("--skip-setup", action="store_true", help="Don't upload files or build the knowledge base")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    report(results, args.elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,21 @@
 import os
+import json
 import logging
 import tempfile
-from fastapi import FastAPI, UploadFile, File, HTTPException, Body
+import time
+import zipfile
+from fastapi import FastAPI, UploadFile, File, HTTPException, Body, Request
 from typing import List
 from pydantic import BaseModel
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, PlainTextResponse
 
 from utils.file_utils import read_documentation_files, read_html_files
 from utils.knowledge_base import build_knowledge_base
 from utils.rag_generation import generate_grounded_test_cases
 from utils.selenium_generator import generate_selenium_script
+from utils.page_objects import generate_suite_support
+from utils.metrics import REGISTRY, HTTP_REQUEST_SECONDS, UPLOAD_BYTES
+from utils.tracing import RECENT_TRACES, trace_request
 
 logging.basicConfig(level=logging.INFO)
 
@@ -24,6 +30,34 @@ HTML_DIR = "uploaded_html"
 os.makedirs(DOCS_DIR, exist_ok=True)
 os.makedirs(HTML_DIR, exist_ok=True)
 
+@app.middleware("http")
+async def trace_http_requests(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    with trace_request(f"{request.method} {request.url.path}") as trace:
+        try:
+            response = await call_next(request)
+            status = response.status_code
+        finally:
+            route = request.scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=request.method,
+                route=getattr(route, "path", "unmatched"),
+                status=str(status),
+            )
+    response.headers["X-Trace-Id"] = trace.trace_id
+    return response
+
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/traces")
+def recent_traces(limit: int = 20):
+    traces = list(RECENT_TRACES)[-limit:]
+    return {"traces": [trace.model_dump() for trace in reversed(traces)]}
+
 @app.get("/")
 def read_root():
     return {"message": "Autonomous QA Agent Backend is running!"}
@@ -32,6 +66,7 @@ def read_root():
 async def upload_documentation(file: UploadFile = File(...)):
     file_location = os.path.join(DOCS_DIR, file.filename)
     contents = await file.read()
+    UPLOAD_BYTES.observe(len(contents), kind="documentation")
     with open(file_location, "wb") as f:
         f.write(contents)
     return {"filename": file.filename, "message": "Documentation uploaded successfully"}
@@ -40,6 +75,7 @@ async def upload_documentation(file: UploadFile = File(...)):
 async def upload_html(file: UploadFile = File(...)):
     file_location = os.path.join(HTML_DIR, file.filename)
     contents = await file.read()
+    UPLOAD_BYTES.observe(len(contents), kind="html")
     with open(file_location, "wb") as f:
         f.write(contents)
     return {"filename": file.filename, "message": "HTML file uploaded successfully"}
@@ -57,17 +93,19 @@ async def generate_test_cases(request: TestCaseRequest):
         if not GEMINI_API_KEY:
             raise HTTPException(status_code=500, detail="GEMINI_API_KEY not set")
         test_cases = generate_grounded_test_cases(request.user_query)
-        if not isinstance(test_cases, str):
-            import json
-            test_cases = json.dumps(test_cases, indent=2)
-        return TestCaseResponse(test_cases=test_cases, status="success")
+        if test_cases is None:
+            raise HTTPException(status_code=502, detail="Failed to generate valid test cases")
+        test_cases_json = json.dumps([tc.model_dump() for tc in test_cases], indent=2)
+        return TestCaseResponse(test_cases=test_cases_json, status="success")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/generate-selenium-script/")
 async def get_selenium_script(test_case_title: str, test_case_description: str):
     try:
-        script_content = generate_selenium_script(test_case_title, test_case_description)
+        script_content = generate_selenium_script(test_case_title, test_case_description, html_dir=HTML_DIR)
         return {"selenium_script": script_content}
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -75,7 +113,7 @@ async def get_selenium_script(test_case_title: str, test_case_description: str):
 @app.get("/download-selenium-script/")
 async def download_selenium_script(test_case_title: str, test_case_description: str):
     try:
-        script_content = generate_selenium_script(test_case_title, test_case_description)
+        script_content = generate_selenium_script(test_case_title, test_case_description, html_dir=HTML_DIR)
         safe_title = test_case_title.lower().replace(" ", "_")
         filename = f"{safe_title}_selenium_test.py"
 
@@ -91,6 +129,35 @@ async def download_selenium_script(test_case_title: str, test_case_description:
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
 
+@app.get("/generate-suite-support/")
+async def get_suite_support():
+    """
+    Shared conftest.py (session-scoped driver) and page objects that generated scripts import.
+    """
+    try:
+        return {"files": generate_suite_support(HTML_DIR)}
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
+@app.get("/download-suite-support/")
+async def download_suite_support():
+    try:
+        files = generate_suite_support(HTML_DIR)
+
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".zip") as tmp_file:
+            with zipfile.ZipFile(tmp_file, "w", zipfile.ZIP_DEFLATED) as archive:
+                for path, content in files.items():
+                    archive.writestr(path, content)
+            filepath = tmp_file.name
+
+        return FileResponse(
+            path=filepath,
+            media_type="application/zip",
+            filename="selenium_suite_support.zip"
+        )
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
 @app.post("/build-knowledge-base/")
 async def build_kb_endpoint(
     documentation_filenames: List[str] = Body(...),
@@ -116,13 +183,7 @@ async def build_kb_endpoint(
             docs_text.append({"text": text, "source": filename})
 
         vectordb = build_knowledge_base(docs_text)
-
-        # Safely get vector count, fallback 0 if unavailable
-        vector_count = 0
-        try:
-            vector_count = vectordb._collection.count()
-        except Exception:
-            pass
+        vector_count = vectordb.count()
 
         return {
             "status": "success",
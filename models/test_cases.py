@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import List
+import json
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, field_validator
+from typing import Any, List, Optional
 
 class TestCase(BaseModel):
     id: int
@@ -13,3 +14,77 @@ class GenerateTestCasesRequest(BaseModel):
 class GenerateTestCasesResponse(BaseModel):
     test_cases: List[TestCase]
     status: str
+
+class GeneratedTestCase(BaseModel):
+    """
+    Test case as produced by the LLM. Accepts the key spellings Gemini tends to use.
+    """
+    model_config = ConfigDict(extra="ignore")
+
+    id: str = Field(validation_alias=AliasChoices("id", "Test_ID", "test_id", "ID"))
+    title: str = Field(validation_alias=AliasChoices("title", "Title"))
+    description: str = Field(default="", validation_alias=AliasChoices("description", "Description"))
+    grounded_in: List[str] = Field(
+        default_factory=list,
+        validation_alias=AliasChoices(
+            "grounded_in", "Grounded_In", "source_document_reference", "source_documents", "sources"
+        ),
+    )
+
+    @field_validator("id", mode="before")
+    @classmethod
+    def _coerce_id(cls, value: Any) -> str:
+        return str(value)
+
+    @field_validator("grounded_in", mode="before")
+    @classmethod
+    def _coerce_sources(cls, value: Any) -> List[str]:
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [value]
+        return [str(v) for v in value]
+
+class SeleniumAction(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    type: str
+    locator_type: str = ""
+    locator_value: str = ""
+    value: str = ""
+
+    @field_validator("value", mode="before")
+    @classmethod
+    def _coerce_value(cls, value: Any) -> str:
+        return "" if value is None else str(value)
+
+class SeleniumAssertion(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    type: str
+    locator_type: str = ""
+    locator_value: str = ""
+    text: str = ""
+    # API assertions: "METHOD /path" from api_endpoints.json, expected status and request body
+    endpoint: str = ""
+    status_code: Optional[int] = None
+    payload: Optional[Any] = None
+
+    @field_validator("text", mode="before")
+    @classmethod
+    def _coerce_text(cls, value: Any) -> str:
+        return "" if value is None else str(value)
+
+    @field_validator("payload")
+    @classmethod
+    def _check_payload(cls, value: Any) -> Any:
+        # Payloads are rendered into scripts with repr(); NaN/Infinity would become bare nan/inf
+        try:
+            json.dumps(value, allow_nan=False)
+        except (TypeError, ValueError):
+            raise ValueError("payload must be plain JSON without NaN or Infinity")
+        return value
+
+class ActionPlan(BaseModel):
+    actions: List[SeleniumAction] = Field(default_factory=list)
+    assertions: List[SeleniumAssertion] = Field(default_factory=list)
@@ -108,3 +108,20 @@ else:
                     st.error(f"Failed to generate Selenium script: {resp.text}")
             except Exception as e:
                 st.error(f"Error generating Selenium script: {str(e)}")
+
+    st.caption("Generated scripts run under pytest and import the shared conftest.py and page objects below.")
+    if st.button("Fetch Suite Support Files"):
+        try:
+            with st.spinner("Generating page objects..."):
+                resp = requests.get(f"{BACKEND_URL}/download-suite-support/", timeout=120)
+            if resp.ok:
+                st.download_button(
+                    "Download selenium_suite_support.zip",
+                    data=resp.content,
+                    file_name="selenium_suite_support.zip",
+                    mime="application/zip",
+                )
+            else:
+                st.error(f"Failed to generate suite support files: {resp.text}")
+        except Exception as e:
+            st.error(f"Error generating suite support files: {str(e)}")
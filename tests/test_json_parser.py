@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from utils.json_parser import IncrementalJSONParser, extract_json
+
+DOCUMENT = {
+    "test_cases": [
+        {"id": "TC-001", "title": "Apply \"SAVE15\" {code}", "tags": ["a,b", "[x]"], "priority": 1},
+        {"id": "TC-002", "title": "Back\\slash", "nested": {"deep": [[1, 2.5], {"ok": True}]}, "skip": None},
+    ],
+    "count": 2,
+}
+TEXT = json.dumps(DOCUMENT, indent=2)
+
+
+def _parse(text, chunk_size=None):
+    parser = IncrementalJSONParser()
+    if chunk_size is None:
+        parser.feed(text)
+    else:
+        for i in range(0, len(text), chunk_size):
+            parser.feed(text[i:i + chunk_size])
+    return parser
+
+
+def _is_prefix(partial, full):
+    """
+    A repaired value must be a structural prefix of the full document.
+    """
+    if isinstance(full, dict):
+        return isinstance(partial, dict) and all(
+            key in full and (partial[key] == full[key] or _is_prefix(partial[key], full[key]))
+            for key in partial
+        )
+    if isinstance(full, list):
+        return (
+            isinstance(partial, list)
+            and len(partial) <= len(full)
+            and all(p == f for p, f in zip(partial[:-1], full))
+            and (not partial or partial[-1] == full[len(partial) - 1] or _is_prefix(partial[-1], full[len(partial) - 1]))
+        )
+    return partial == full
+
+
+@pytest.mark.parametrize("chunk_size", [None, 1, 2, 7, 64])
+def test_complete_document_in_chunks(chunk_size):
+    parser = _parse(TEXT, chunk_size)
+    assert parser.complete
+    assert parser.value() == DOCUMENT
+
+
+def test_truncation_at_every_offset_repairs_to_prefix():
+    assert _parse("").value() is None
+    for offset in range(1, len(TEXT)):
+        parser = _parse(TEXT[:offset])
+        assert not parser.complete
+        value = parser.value()
+        assert value is not None, f"offset {offset}: {parser.repaired_text()!r}"
+        assert _is_prefix(value, DOCUMENT), f"offset {offset}: {value!r}"
+
+
+def test_truncation_then_continuation_completes():
+    cut = len(TEXT) // 2
+    parser = _parse(TEXT[:cut])
+    assert parser.feed(TEXT[cut:])
+    assert parser.value() == DOCUMENT
+
+
+@pytest.mark.parametrize("prefix", ["", "Here are the test cases:\n", "```json\n", "Sure! Output follows.\n\n```\n"])
+def test_prose_and_fence_prefixes_are_skipped(prefix):
+    assert extract_json(prefix + TEXT + "\n```\nHope this helps!") == DOCUMENT
+
+
+def test_no_json_returns_default():
+    assert extract_json("no structured output here", default={}) == {}
+
+
+def test_mismatched_closer_stops_parsing_and_returns_repaired_prefix():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"actions": [1, 2}')
+    assert parser.complete
+    assert parser.value(default="fallback") == {"actions": [1]}
+    # Later chunks are ignored once the root has ended
+    assert parser.feed('], "more": 1}')
+    assert parser.value(default="fallback") == {"actions": [1]}
+
+
+def test_continuation_that_restarts_document_keeps_earlier_prefix():
+    parser = IncrementalJSONParser()
+    parser.feed('[{"id": "1", "title": "t1"}, {')
+    parser.feed('[{"id":"1","title":"t1"}]')
+    assert parser.value(default="fallback") == [{"id": "1", "title": "t1"}, {}]
+
+
+def test_only_first_root_value_is_returned():
+    assert extract_json('[1, 2] trailing {"b": 2}') == [1, 2]
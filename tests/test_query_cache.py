@@ -0,0 +1,95 @@
+from typing import List
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from utils.query_cache import QueryCache, normalize_query
+from utils.vector_store import InProcessVectorStore
+
+VECTORS = {
+    "discount code": [1.0, 0.0, 0.0],
+    "discount codes": [0.99, 0.1, 0.0],
+    "shipping": [0.0, 1.0, 0.0],
+    "payment": [0.0, 0.0, 1.0],
+}
+
+
+class FakeEmbeddings(Embeddings):
+    def __init__(self):
+        self.query_calls = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [VECTORS[text] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.query_calls += 1
+        return VECTORS[text]
+
+
+class CountingStore(InProcessVectorStore):
+    searches = 0
+
+    def similarity_search_by_vector(self, embedding, k=4):
+        self.searches += 1
+        return super().similarity_search_by_vector(embedding, k)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CountingStore(FakeEmbeddings(), str(tmp_path))
+    store.add_texts(["discount code", "shipping"])
+    return store
+
+
+def _texts(docs):
+    return [doc.page_content for doc in docs]
+
+
+def test_normalize_query():
+    assert normalize_query("  Discount   CODE?") == "discount code"
+
+
+def test_repeated_query_is_served_from_cache(store):
+    cache = QueryCache(semantic_threshold=0)
+    first = cache.search(store, "Discount code", 1)
+    second = cache.search(store, "discount  code?", 1)
+    assert _texts(first) == _texts(second) == ["discount code"]
+    assert store.searches == 1
+    assert store.embedding.query_calls == 1
+
+
+def test_add_texts_invalidates_cached_results(store):
+    cache = QueryCache(semantic_threshold=0)
+    assert _texts(cache.search(store, "payment", 1)) != ["payment"]
+    revision = store.revision
+    store.add_texts(["payment"])
+    assert store.revision != revision
+    assert _texts(cache.search(store, "payment", 1)) == ["payment"]
+    assert store.searches == 2
+    # The query embedding itself does not depend on the index and stays cached
+    assert store.embedding.query_calls == 1
+
+
+def test_rebuild_by_another_store_instance_invalidates_cache(store, tmp_path):
+    cache = QueryCache(semantic_threshold=0)
+    cache.search(store, "payment", 1)
+    other_worker = InProcessVectorStore(FakeEmbeddings(), str(tmp_path))
+    other_worker.add_texts(["payment"])
+    assert _texts(cache.search(store, "payment", 1)) == ["payment"]
+
+
+def test_semantic_threshold_reuses_near_match(store):
+    cache = QueryCache(semantic_threshold=0.95)
+    cache.search(store, "discount code", 1)
+    assert _texts(cache.search(store, "discount codes", 1)) == ["discount code"]
+    assert store.searches == 1
+    # A query below the threshold goes to the index
+    cache.search(store, "shipping", 1)
+    assert store.searches == 2
+
+
+def test_semantic_threshold_disabled_searches_index(store):
+    cache = QueryCache(semantic_threshold=0)
+    cache.search(store, "discount code", 1)
+    cache.search(store, "discount codes", 1)
+    assert store.searches == 2
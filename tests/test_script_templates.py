@@ -0,0 +1,106 @@
+import ast
+
+import pytest
+
+from models.test_cases import ActionPlan, SeleniumAction, SeleniumAssertion
+from utils import script_templates
+from utils.script_templates import (
+    ACTION_TEMPLATES,
+    ASSERTION_TEMPLATES,
+    check_syntax,
+    render_action,
+    render_assertion,
+    render_script,
+)
+
+NASTY = 'it\'s "quoted" \\ back\\slash\nnew line \'\'\' """ {brace} $dollar'
+
+ENDPOINTS = {"POST /apply_coupon": {"code": "string", "count": "integer"}}
+
+
+@pytest.fixture(autouse=True)
+def api_endpoints(monkeypatch):
+    monkeypatch.setattr(script_templates, "load_api_endpoints", lambda: ENDPOINTS)
+
+
+def _string_constants(script):
+    return {node.value for node in ast.walk(ast.parse(script)) if isinstance(node, ast.Constant)}
+
+
+def test_special_characters_are_escaped():
+    plan = ActionPlan(
+        actions=[
+            SeleniumAction(type="input", locator_type="css selector", locator_value=NASTY, value=NASTY),
+            SeleniumAction(type="navigate", value=NASTY),
+        ],
+        assertions=[SeleniumAssertion(type="title_contains", text=NASTY)],
+    )
+    script = render_script(plan, base_url=NASTY)
+    check_syntax(script)
+    constants = _string_constants(script)
+    assert NASTY in constants
+    assert "CSS_SELECTOR=" + NASTY in constants
+
+
+@pytest.mark.parametrize("action_type", sorted(ACTION_TEMPLATES))
+def test_each_action_type_renders_valid_code(action_type):
+    action = SeleniumAction(type=action_type, locator_type="id", locator_value="discount-code", value="SAVE15")
+    step = render_action(action)
+    assert step
+    check_syntax(render_script(ActionPlan(actions=[action]), "http://localhost:8501"))
+
+
+@pytest.mark.parametrize("assertion_type", sorted(ASSERTION_TEMPLATES))
+def test_each_assertion_type_renders_valid_code(assertion_type):
+    assertion = SeleniumAssertion(
+        type=assertion_type,
+        locator_type="ID",
+        locator_value="success-message",
+        text="Payment Successful!",
+        endpoint="POST /apply_coupon",
+        status_code=200,
+    )
+    step = render_assertion(assertion)
+    assert step
+    # Failed checks must fail the pytest test rather than being logged and swallowed
+    assert "except" not in step
+    check_syntax(render_script(ActionPlan(assertions=[assertion]), "http://localhost:8501"))
+
+
+def test_unsupported_or_incomplete_steps_are_skipped():
+    assert render_action(SeleniumAction(type="teleport", value="x")) == ""
+    assert render_action(SeleniumAction(type="click", locator_type="bogus", locator_value="x")) == ""
+    assert render_action(SeleniumAction(type="navigate")) == ""
+    assert render_assertion(SeleniumAssertion(type="url_contains")) == ""
+
+
+def test_page_locators_render_as_page_object_attributes():
+    used_pages = set()
+    index = {("ID", "discount-code"): ("checkout_page", "CheckoutPage", "DISCOUNT_CODE")}
+    action = SeleniumAction(type="click", locator_type="id", locator_value="discount-code")
+    step = render_action(action, index, used_pages)
+    assert "CheckoutPage.DISCOUNT_CODE" in step
+    assert used_pages == {("checkout_page", "CheckoutPage")}
+
+
+def test_api_assertion_uses_sample_payload_for_known_endpoint():
+    step = render_assertion(SeleniumAssertion(type="api_response", endpoint="post  /apply_coupon"))
+    assert "'POST'" in step
+    assert "json={'code': 'test', 'count': 1}" in step
+
+
+def test_api_assertion_for_unknown_endpoint_is_skipped():
+    assertion = SeleniumAssertion(type="api_response", endpoint="DELETE /users")
+    assert render_assertion(assertion) == ""
+    assert render_assertion(SeleniumAssertion(type="api_response", endpoint="/no-method")) == ""
+
+
+def test_non_finite_payload_is_rejected():
+    with pytest.raises(ValueError):
+        SeleniumAssertion(type="api_response", endpoint="POST /apply_coupon", payload={"code": float("nan")})
+
+
+def test_check_syntax_raises_on_invalid_code():
+    check_syntax("def test_case(driver, wait):\n    pass\n")
+    with pytest.raises(ValueError, match="line 2"):
+        check_syntax("def test_case(driver, wait):\n    x = (\n")
@@ -0,0 +1,203 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from models.test_cases import ActionPlan, GeneratedTestCase, SeleniumAction, SeleniumAssertion
+
+logger = logging.getLogger(__name__)
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class IncrementalJSONParser:
+    """
+    Incremental parser for the first JSON object/array embedded in LLM output.
+
+    Text can be fed in chunks (e.g. from a streamed response). Prose or markdown
+    fences before the JSON are skipped. The parser tracks nesting state and the
+    last position where the document can be cut and closed, so truncated output
+    (e.g. hitting max_output_tokens) can be repaired instead of discarded.
+    """
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._length = 0
+        self._start: Optional[int] = None
+        self._end: Optional[int] = None
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        # (offset into buffer, closers needed) for the last safe cut point
+        self._cut: Optional[Tuple[int, str]] = None
+        # Cut point in effect before each fed chunk, to fall back on if a later chunk
+        # (e.g. a continuation that restarts the document) makes the repair invalid
+        self._chunk_cuts: List[Tuple[int, str]] = []
+        self._malformed = False
+
+    @property
+    def started(self) -> bool:
+        return self._start is not None
+
+    @property
+    def complete(self) -> bool:
+        return self._end is not None
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Consume the next chunk of text. Returns True once the root value is complete.
+        """
+        if self.complete or not chunk:
+            return self.complete
+
+        if self._cut is not None:
+            self._chunk_cuts.append(self._cut)
+        offset = self._length
+        self._buffer.append(chunk)
+        self._length += len(chunk)
+
+        for i, ch in enumerate(chunk):
+            pos = offset + i
+            if self._start is None:
+                if ch in _CLOSERS:
+                    self._start = pos
+                    self._stack.append(_CLOSERS[ch])
+                    self._mark_cut(pos + 1)
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in _CLOSERS:
+                self._stack.append(_CLOSERS[ch])
+                self._mark_cut(pos + 1)
+            elif ch in "}]":
+                if not self._stack or self._stack[-1] != ch:
+                    # Malformed nesting; stop here and repair from the last known good cut.
+                    logger.warning(f"Mismatched '{ch}' in model output at offset {pos}.")
+                    self._malformed = True
+                    self._end = pos
+                    return True
+                self._stack.pop()
+                if not self._stack:
+                    self._end = pos + 1
+                    return True
+                self._mark_cut(pos + 1)
+            elif ch == ",":
+                self._mark_cut(pos)
+
+        return False
+
+    def _mark_cut(self, pos: int) -> None:
+        self._cut = (pos, "".join(reversed(self._stack)))
+
+    def text(self) -> str:
+        """
+        Return the raw JSON text seen so far (from the root's opening bracket).
+        """
+        if self._start is None:
+            return ""
+        raw = "".join(self._buffer)
+        return raw[self._start:self._end]
+
+    def _repair(self, cut: Tuple[int, str]) -> str:
+        pos, closers = cut
+        raw = "".join(self._buffer)
+        return raw[self._start:pos].rstrip().rstrip(",") + closers
+
+    def repaired_text(self) -> str:
+        """
+        Return valid JSON text: the full document if complete, otherwise the
+        longest prefix ending on a complete value, with open containers closed.
+        """
+        if self._start is None:
+            return ""
+        if self._cut is None or (self.complete and not self._malformed):
+            return self.text()
+        return self._repair(self._cut)
+
+    def value(self, default: Any = None) -> Any:
+        """
+        Decode the (possibly repaired) root value, or return `default`.
+
+        If the repair doesn't decode, the cut points from before each earlier
+        chunk are tried in turn, newest first.
+        """
+        text = self.repaired_text()
+        if not text:
+            return default
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Could not decode JSON from model output: {e}")
+        for cut in reversed(self._chunk_cuts):
+            try:
+                return json.loads(self._repair(cut))
+            except json.JSONDecodeError:
+                continue
+        return default
+
+
+def extract_json(text: str, default: Any = None) -> Any:
+    """
+    Extract the first JSON object or array from text, repairing truncation if needed.
+    """
+    parser = IncrementalJSONParser()
+    parser.feed(text or "")
+    if parser.started and not parser.complete:
+        logger.warning("Model output was truncated; returning repaired JSON prefix.")
+    return parser.value(default)
+
+
+def _validate_items(items: Any, model) -> List[Any]:
+    """
+    Validate each item independently so one malformed entry doesn't discard the rest.
+    """
+    if isinstance(items, dict):
+        items = [items]
+    if not isinstance(items, list):
+        return []
+    valid = []
+    for item in items:
+        try:
+            valid.append(model.model_validate(item))
+        except ValidationError as e:
+            logger.warning(f"Dropping invalid {model.__name__}: {e.errors()[0].get('msg')}")
+    return valid
+
+
+def parse_test_cases(value: Any) -> List[GeneratedTestCase]:
+    """
+    Validate decoded LLM output as a list of test cases.
+
+    Accepts a bare list, a single test case, or an object wrapping the list
+    (e.g. {"test_cases": [...]}).
+    """
+    if isinstance(value, dict):
+        for key in ("test_cases", "testCases", "Test_Cases", "tests"):
+            if key in value:
+                value = value[key]
+                break
+    return _validate_items(value, GeneratedTestCase)
+
+
+def parse_action_plan(value: Any) -> ActionPlan:
+    """
+    Validate decoded LLM output as a Selenium action/assertion plan.
+    """
+    if not isinstance(value, dict):
+        return ActionPlan()
+    data: Dict[str, Any] = value
+    return ActionPlan(
+        actions=_validate_items(data.get("actions", []), SeleniumAction),
+        assertions=_validate_items(data.get("assertions", []), SeleniumAssertion),
+    )
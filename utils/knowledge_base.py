@@ -1,18 +1,21 @@
 # utils/knowledge_base.py
 
-import os
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
+
+from utils.metrics import KB_CHUNKS
+from utils.tracing import span
+from utils.vector_store import VectorStore, get_vector_store
 
 logger = logging.getLogger(__name__)
 
+
 def build_knowledge_base(
     documents: List[Dict[str, str]],  # Each dict with {"text": str, "source": str}
-    persist_dir: str = "chroma_store"
-) -> Chroma:
+    persist_dir: Optional[str] = None,
+    backend: Optional[str] = None,
+) -> VectorStore:
     """
     Build a vector database knowledge base by chunking and embedding document texts.
 
@@ -20,10 +23,11 @@ def build_knowledge_base(
         documents: List of documents, where each doc is a dict with:
             - 'text': the document text content
             - 'source': the source filename or descriptor to keep metadata
-        persist_dir: Directory path to persist Chroma vector store.
+        persist_dir: Directory to persist the index in (defaults to the backend's directory).
+        backend: Vector store backend, "chroma" or "inprocess" (defaults to VECTOR_STORE_BACKEND).
 
     Returns:
-        Chroma vector store instance with persisted embeddings and metadata.
+        Vector store instance with persisted embeddings and metadata.
     """
 
     try:
@@ -32,19 +36,19 @@ def build_knowledge_base(
         texts = []
         metadatas = []
 
-        for doc in documents:
-            chunks = splitter.split_text(doc["text"])
-            texts.extend(chunks)
-            metadatas.extend([{"source_document": doc["source"]}] * len(chunks))
-
-        embed_model = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-
-        os.makedirs(persist_dir, exist_ok=True)
+        with span("chunking", documents=len(documents)):
+            for doc in documents:
+                chunks = splitter.split_text(doc["text"])
+                texts.extend(chunks)
+                metadatas.extend([{"source_document": doc["source"]}] * len(chunks))
+        KB_CHUNKS.observe(len(texts))
 
-        vectordb = Chroma(persist_directory=persist_dir, embedding_function=embed_model)
+        vectordb = get_vector_store(persist_dir, backend)
 
-        vectordb.add_texts(texts=texts, metadatas=metadatas)
-        vectordb.persist()
+        # Includes the nested "embedding" span for the chunk texts
+        with span("vector_add", chunks=len(texts)):
+            vectordb.add_texts(texts=texts, metadatas=metadatas)
+            vectordb.persist()
 
         logger.info(f"Knowledge base built and saved with {len(texts)} text chunks.")
         return vectordb
@@ -63,4 +67,4 @@ if __name__ == "__main__":
     ]
 
     vector_store = build_knowledge_base(docs)
-    print(f"Vector store built and persisted with {len(vector_store)} vectors.")
+    print(f"Vector store built and persisted with {vector_store.count()} vectors.")
@@ -0,0 +1,241 @@
+import logging
+import os
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from utils.metrics import record_cache
+from utils.script_templates import PageLocatorIndex, check_syntax
+
+logger = logging.getLogger(__name__)
+
+FIELD_TAGS = {"input", "select", "textarea"}
+BUTTON_INPUT_TYPES = {"button", "submit", "reset", "image"}
+CHOICE_INPUT_TYPES = {"radio", "checkbox"}
+# Class attributes of the rendered page object that locators must not shadow
+RESERVED_ATTRS = {"PATH"}
+
+CONFTEST_SOURCE = '''import pytest
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support.ui import WebDriverWait
+from webdriver_manager.chrome import ChromeDriverManager
+
+
+@pytest.fixture(scope="session")
+def driver():
+    """
+    One browser per pytest session (i.e. per xdist worker), shared by every test.
+    """
+    service = Service(ChromeDriverManager().install())
+    driver = webdriver.Chrome(service=service)
+    yield driver
+    driver.quit()
+
+
+@pytest.fixture
+def wait(driver):
+    driver.delete_all_cookies()
+    return WebDriverWait(driver, 10)
+'''
+
+
+class PageLocator(BaseModel):
+    attr: str
+    by: str
+    value: str
+    kind: str  # "field", "button" or "element"
+
+
+class PageObject(BaseModel):
+    """
+    Locators for one uploaded HTML page, rendered as a shared page-object class.
+    """
+    source: str
+    module: str
+    class_name: str
+    locators: List[PageLocator] = Field(default_factory=list)
+
+
+class _LocatorCollector(HTMLParser):
+    """
+    Collect form fields, buttons and other elements with an id from an HTML page.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.found: List[Tuple[str, str, str, str]] = []  # (name hint, by, value, kind)
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        attributes = {key: value or "" for key, value in attrs}
+        element_id = attributes.get("id", "")
+        name = attributes.get("name", "")
+        input_type = attributes.get("type", "text").lower()
+
+        if tag == "button" or (tag == "input" and input_type in BUTTON_INPUT_TYPES):
+            kind = "button"
+        elif tag in FIELD_TAGS:
+            kind = "field"
+        elif tag in ("html", "head", "body", "script", "style"):
+            return
+        else:
+            kind = "element"
+
+        if element_id:
+            self.found.append((element_id, "ID", element_id, kind))
+        elif kind == "element":
+            return
+        elif tag == "input" and input_type in CHOICE_INPUT_TYPES and name and attributes.get("value"):
+            value = attributes["value"]
+            if '"' not in name and '"' not in value:
+                self.found.append((f"{name}_{value}", "CSS_SELECTOR", f'input[name="{name}"][value="{value}"]', kind))
+        elif name:
+            self.found.append((name, "NAME", name, kind))
+
+
+def _identifier(text: str, upper: bool = True) -> str:
+    ident = re.sub(r"\W+", "_", text).strip("_")
+    if not ident:
+        ident = "element"
+    if ident[0].isdigit():
+        ident = f"_{ident}"
+    return ident.upper() if upper else ident.lower()
+
+
+def extract_page_object(filename: str, html: str) -> PageObject:
+    """
+    Derive a page object from an HTML page's form fields, buttons and id'd elements.
+    """
+    collector = _LocatorCollector()
+    collector.feed(html)
+
+    stem = _identifier(os.path.splitext(os.path.basename(filename))[0], upper=False)
+    class_name = "".join(part.capitalize() for part in stem.split("_") if part) + "Page"
+    if class_name[0].isdigit():
+        class_name = f"Page{class_name}"
+    page = PageObject(source=filename, module=f"{stem}_page", class_name=class_name)
+
+    seen = set()
+    attrs = set(RESERVED_ATTRS)
+    for hint, by, value, kind in collector.found:
+        if (by, value) in seen:
+            continue
+        seen.add((by, value))
+        attr = _identifier(hint)
+        suffix = 2
+        while attr in attrs:
+            attr = f"{_identifier(hint)}_{suffix}"
+            suffix += 1
+        attrs.add(attr)
+        page.locators.append(PageLocator(attr=attr, by=by, value=value, kind=kind))
+    return page
+
+
+def render_page_object_module(page: PageObject) -> str:
+    """
+    Render a page object as an importable Python module.
+    """
+    lines = [
+        "from urllib.parse import urljoin",
+        "from selenium.webdriver.common.by import By",
+        "",
+        "",
+        f"class {page.class_name}:",
+        f'    """Locators for {page.source}."""',
+        "",
+        f"    PATH = {page.source!r}",
+        "",
+    ]
+    for kind, heading in (("field", "Form fields"), ("button", "Buttons"), ("element", "Other elements")):
+        locators = [loc for loc in page.locators if loc.kind == kind]
+        if not locators:
+            continue
+        lines.append(f"    # {heading}")
+        lines.extend(f"    {loc.attr} = (By.{loc.by}, {loc.value!r})" for loc in locators)
+        lines.append("")
+    lines.extend([
+        "    def __init__(self, driver):",
+        "        self.driver = driver",
+        "",
+        "    def open(self, base_url):",
+        "        self.driver.get(urljoin(base_url, self.PATH))",
+        "        return self",
+        "",
+        "    def find(self, locator):",
+        "        return self.driver.find_element(*locator)",
+    ])
+    return "\n".join(lines) + "\n"
+
+
+# filename -> (mtime, page object); pages are only re-parsed when the upload changes
+_page_cache: Dict[str, Tuple[float, PageObject]] = {}
+
+
+def load_page_objects(html_dir: str = "uploaded_html") -> List[PageObject]:
+    """
+    Build (or reuse cached) page objects for every uploaded HTML page.
+    """
+    if not os.path.isdir(html_dir):
+        return []
+
+    pages = []
+    modules = set()
+    for filename in sorted(os.listdir(html_dir)):
+        if not filename.lower().endswith((".html", ".htm")):
+            continue
+        file_path = os.path.join(html_dir, filename)
+        mtime = os.path.getmtime(file_path)
+        cached = _page_cache.get(file_path)
+        hit = cached is not None and cached[0] == mtime
+        record_cache("page_objects", hit)
+        if not hit:
+            try:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    cached = (mtime, extract_page_object(filename, f.read()))
+            except Exception as e:
+                logger.error(f"Failed building page object for '{filename}': {e}")
+                continue
+            _page_cache[file_path] = cached
+
+        # Pages whose names sanitize the same (checkout.html/checkout.htm, my-page/my_page)
+        # get numbered modules and classes instead of overwriting each other
+        page = cached[1]
+        module, class_name = page.module, page.class_name
+        suffix = 2
+        while module in modules:
+            module, class_name = f"{page.module}_{suffix}", f"{page.class_name}{suffix}"
+            suffix += 1
+        if module != page.module:
+            page = page.model_copy(update={"module": module, "class_name": class_name})
+        modules.add(module)
+        pages.append(page)
+    return pages
+
+
+def build_locator_index(pages: List[PageObject]) -> PageLocatorIndex:
+    """
+    Map each (By, locator value) to the first page-object attribute that defines it.
+    """
+    index: PageLocatorIndex = {}
+    for page in pages:
+        for loc in page.locators:
+            index.setdefault((loc.by, loc.value), (page.module, page.class_name, loc.attr))
+    return index
+
+
+def generate_suite_support(html_dir: str = "uploaded_html") -> Dict[str, str]:
+    """
+    Generate the shared files generated test scripts import: a conftest.py with the
+    session-scoped driver fixture and one page-object module per uploaded HTML page.
+
+    Returns:
+        Mapping of relative file path to file contents.
+    """
+    files = {"conftest.py": CONFTEST_SOURCE, "pages/__init__.py": ""}
+    for page in load_page_objects(html_dir):
+        path = f"pages/{page.module}.py"
+        files[path] = render_page_object_module(page)
+        check_syntax(files[path], path)
+    return files
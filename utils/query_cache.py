@@ -0,0 +1,125 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from utils.metrics import record_cache
+from utils.vector_store import VectorStore
+
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "256"))
+# Cosine similarity above which a cached query's results are reused for a new query; 0 disables
+QUERY_CACHE_SEMANTIC_THRESHOLD = float(os.getenv("QUERY_CACHE_SEMANTIC_THRESHOLD", "0"))
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form used as the cache key: lowercase, single spaces, no trailing punctuation.
+    """
+    return " ".join(query.lower().split()).rstrip(".?!")
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used mapping with a fixed number of entries.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        with self._lock:
+            return list(self._data.items())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class QueryCache:
+    """
+    Caches query embeddings and top-k retrieval results for normalized queries.
+
+    Retrieval entries are keyed by the vector store's persisted revision, so rebuilding
+    the knowledge base in any worker process invalidates them. With a semantic threshold set, a query that
+    misses exactly can reuse the results of a cached query whose embedding is close enough.
+    """
+
+    def __init__(self, maxsize: int = QUERY_CACHE_SIZE, semantic_threshold: float = QUERY_CACHE_SEMANTIC_THRESHOLD):
+        self.semantic_threshold = semantic_threshold
+        self.embeddings = LRUCache(maxsize)
+        # (store id, revision, normalized query, k) -> (unit query embedding, documents)
+        self.results = LRUCache(maxsize)
+
+    def embed_query(self, store: VectorStore, normalized_query: str) -> np.ndarray:
+        key = (id(store.embedding), normalized_query)
+        embedding = self.embeddings.get(key)
+        record_cache("query_embedding", embedding is not None)
+        if embedding is None:
+            embedding = np.asarray(store.embedding.embed_query(normalized_query), dtype=np.float32)
+            self.embeddings.set(key, embedding)
+        return embedding
+
+    def _near_match(self, store: VectorStore, revision: str, unit: np.ndarray, k: int) -> Optional[List[Document]]:
+        best_score, best_docs = self.semantic_threshold, None
+        for (store_id, cached_revision, _, cached_k), (cached_unit, docs) in self.results.items():
+            if store_id != id(store) or cached_revision != revision or cached_k != k:
+                continue
+            score = float(unit @ cached_unit)
+            if score >= best_score:
+                best_score, best_docs = score, docs
+        return best_docs
+
+    def search(self, store: VectorStore, query: str, k: int) -> List[Document]:
+        """
+        Top-k documents for `query`, served from cache when possible.
+        """
+        normalized = normalize_query(query)
+        revision = store.revision
+        key = (id(store), revision, normalized, k)
+        cached = self.results.get(key)
+        record_cache("retrieval", cached is not None)
+        if cached is not None:
+            return list(cached[1])
+
+        embedding = self.embed_query(store, normalized)
+        unit = embedding / max(float(np.linalg.norm(embedding)), 1e-12)
+
+        if self.semantic_threshold > 0:
+            docs = self._near_match(store, revision, unit, k)
+            record_cache("retrieval_semantic", docs is not None)
+            if docs is not None:
+                self.results.set(key, (unit, docs))
+                return list(docs)
+
+        docs = store.similarity_search_by_vector(embedding.tolist(), k=k)
+        self.results.set(key, (unit, docs))
+        return list(docs)
+
+    def clear(self) -> None:
+        self.embeddings.clear()
+        self.results.clear()
+
+
+QUERY_CACHE = QueryCache()
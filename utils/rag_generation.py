@@ -1,26 +1,46 @@
 import os
 import logging
-from typing import Optional
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
+from typing import List, Optional, Tuple
 import requests
 import json
 
+from models.test_cases import GeneratedTestCase
+from utils.json_parser import IncrementalJSONParser, parse_test_cases
+from utils.metrics import record_llm_usage
+from utils.query_cache import QUERY_CACHE
+from utils.tracing import span
+from utils.vector_store import get_vector_store
+
 logging.basicConfig(level=logging.INFO)
 
-EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
-CHROMA_PERSIST_DIR = "chroma_store"
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")  # Gemini Studio API token from environment
 
-embed_model = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
-vectordb = Chroma(persist_directory=CHROMA_PERSIST_DIR, embedding_function=embed_model)
+vectordb = get_vector_store()
+
+# Override to point at a Gemini-compatible server, e.g. the local stub in llm_stub.py
+GEMINI_API_URL = os.getenv(
+    "GEMINI_API_URL",
+    "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent",
+)
 
-GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent"
+# Extra calls allowed to fetch the tail of output cut off by max_output_tokens
+MAX_CONTINUATIONS = 2
 
 def query_gemini_model(prompt: str) -> str:
     """
     Call Gemini API with the provided prompt and return the raw content response.
     """
+    text, _ = _query_gemini(prompt)
+    return text
+
+
+def _query_gemini(prompt: str, json_mode: bool = True) -> Tuple[str, Optional[str]]:
+    """
+    Call Gemini API and return the response text along with the candidate's finish reason.
+
+    With json_mode off the response MIME type is not forced to JSON, so the model can
+    return a raw fragment (e.g. the missing tail of a truncated document).
+    """
     logging.info("Starting Gemini API call...")
     headers = {
         "x-goog-api-key": GEMINI_API_KEY,
@@ -35,30 +55,85 @@ def query_gemini_model(prompt: str) -> str:
         "generationConfig": {  # Added generationConfig for proper response management
             "temperature": 0.7,
             "max_output_tokens": 1024,
-            "responseMimeType": "application/json"
         }
     }
+    if json_mode:
+        payload["generationConfig"]["responseMimeType"] = "application/json"
     logging.debug(f"Gemini API Payload: {json.dumps(payload, indent=2)}")
 
-    response = requests.post(GEMINI_API_URL, headers=headers, json=payload, timeout=30)
-    response.raise_for_status()
-    data = response.json()
+    with span("llm_call", caller="test_cases"):
+        response = requests.post(GEMINI_API_URL, headers=headers, json=payload, timeout=30)
+        response.raise_for_status()
+        data = response.json()
+    record_llm_usage("test_cases", data)
     logging.info("Gemini API call completed.")
 
     if "candidates" in data and len(data["candidates"]) > 0:
-        content = data["candidates"][0].get("content", "")
+        candidate = data["candidates"][0]
+        finish_reason = candidate.get("finishReason")
+        content = candidate.get("content", "")
         # If content is a string, return it directly
         if isinstance(content, str):
-            return content
+            return content, finish_reason
         # If content is a dict with 'parts', concatenate text parts
         if isinstance(content, dict) and "parts" in content:
-            return "".join(part.get("text", "") for part in content["parts"])
+            return "".join(part.get("text", "") for part in content["parts"]), finish_reason
         # Otherwise, convert to string as fallback
-        return str(content)
-    return ""
+        return str(content), finish_reason
+    return "", None
 
 
-def generate_grounded_test_cases(user_query: str, top_k: int = 5) -> Optional[str]:
+def _strip_code_fence(text: str) -> str:
+    """
+    Remove a markdown code fence the model may wrap a plain-text continuation in.
+    """
+    stripped = text.strip()
+    if not stripped.startswith("```"):
+        return text
+    stripped = stripped.split("\n", 1)[1] if "\n" in stripped else ""
+    if stripped.rstrip().endswith("```"):
+        stripped = stripped.rstrip()[:-3]
+    return stripped
+
+
+def query_gemini_json(prompt: str, max_continuations: int = MAX_CONTINUATIONS) -> IncrementalJSONParser:
+    """
+    Query Gemini for a JSON document, re-requesting only the missing tail if the
+    output is truncated. Returns the parser holding the (possibly repaired) document.
+    """
+    parser = IncrementalJSONParser()
+    text, finish_reason = _query_gemini(prompt)
+    parser.feed(text)
+
+    continuations = 0
+    while parser.started and not parser.complete and continuations < max_continuations:
+        continuations += 1
+        logging.info(
+            f"Gemini output truncated (finishReason={finish_reason}); requesting continuation {continuations}."
+        )
+        continuation_prompt = (
+            f"{prompt}\n\n"
+            "Your previous response was cut off. It ended with:\n"
+            f"{parser.text()[-500:]}\n\n"
+            "Continue the JSON exactly from where it stops. Output ONLY the remaining characters, "
+            "without repeating anything already written."
+        )
+        try:
+            # Plain-text mode: JSON mode would make Gemini answer with a new standalone document
+            text, finish_reason = _query_gemini(continuation_prompt, json_mode=False)
+        except Exception as e:
+            # Keep the truncated document; its repaired prefix is still usable
+            logging.error(f"Gemini continuation {continuations} failed: {e}")
+            break
+        text = _strip_code_fence(text)
+        if not text:
+            break
+        parser.feed(text)
+
+    return parser
+
+
+def generate_grounded_test_cases(user_query: str, top_k: int = 5) -> Optional[List[GeneratedTestCase]]:
     """
     Retrieve relevant documents and generate grounded test cases from Gemini API.
 
@@ -67,22 +142,14 @@ def generate_grounded_test_cases(user_query: str, top_k: int = 5) -> Optional[st
         top_k: Number of top relevant docs to retrieve.
 
     Returns:
-        JSON string of generated test cases.
+        Validated test cases, or None if generation failed.
     """
-    retriever = vectordb.as_retriever(search_kwargs={"k": top_k})
-
-    # Updated method usage: consider switching to invoke() in future LangChain versions
-    try:
-        relevant_docs = retriever.get_relevant_documents(user_query)
-    except AttributeError:
-        # fallback or migration path if get_relevant_documents deprecated
-        relevant_docs = retriever.invoke(user_query)  # Adjust this based on actual LangChain version
-
-    context = "\n\n".join(doc.page_content for doc in relevant_docs)
+    with span("vector_query", top_k=top_k):
+        relevant_docs = QUERY_CACHE.search(vectordb, user_query, top_k)
 
     if not GEMINI_API_KEY:
         logging.info("GEMINI_API_KEY not found: using mock test case output")
-        return """
+        return parse_test_cases(json.loads("""
         [
           {
             "Test_ID": "TC-001",
@@ -91,19 +158,29 @@ def generate_grounded_test_cases(user_query: str, top_k: int = 5) -> Optional[st
             "Grounded_In": ["product_specs.md"]
           }
         ]
-        """
-
-    prompt = (
-        "You are an expert QA test case generator.\n"
-        "Create structured test cases with IDs, titles, descriptions, and source document references.\n"
-        "Use ONLY the following documentation context:\n\n"
-        f"{context}\n\n"
-        f"User query:\n{user_query}\n\n"
-        "Respond ONLY with well-formed JSON."
-    )
+        """))
+
+    with span("prompt_build"):
+        context = "\n\n".join(doc.page_content for doc in relevant_docs)
+        prompt = (
+            "You are an expert QA test case generator.\n"
+            "Create structured test cases with IDs, titles, descriptions, and source document references.\n"
+            'Return a JSON array of objects with the keys "id", "title", "description" and "grounded_in" '
+            "(a list of source document names).\n"
+            "Use ONLY the following documentation context:\n\n"
+            f"{context}\n\n"
+            f"User query:\n{user_query}\n\n"
+            "Respond ONLY with well-formed JSON."
+        )
 
     try:
-        return query_gemini_model(prompt)
+        parser = query_gemini_json(prompt)
+        with span("parse_output"):
+            test_cases = parse_test_cases(parser.value())
+        if not test_cases:
+            logging.error("Gemini response contained no valid test cases.")
+            return None
+        return test_cases
     except Exception as e:
         logging.error(f"Error generating test cases: {e}")
         return None
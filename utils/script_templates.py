@@ -0,0 +1,315 @@
+import json
+import logging
+import os
+from functools import lru_cache
+from string import Template
+from typing import Any, Dict, Optional, Set, Tuple
+
+from models.test_cases import ActionPlan, SeleniumAction, SeleniumAssertion
+
+logger = logging.getLogger(__name__)
+
+# (By attribute, locator value) -> (page module, page class, attribute name)
+PageLocatorIndex = Dict[Tuple[str, str], Tuple[str, str, str]]
+
+API_ENDPOINTS_FILE = "api_endpoints.json"
+
+# Accepted spellings of Selenium `By` locator strategies
+LOCATOR_TYPES = {
+    "ID": "ID",
+    "NAME": "NAME",
+    "XPATH": "XPATH",
+    "CSS": "CSS_SELECTOR",
+    "CSS_SELECTOR": "CSS_SELECTOR",
+    "CLASS": "CLASS_NAME",
+    "CLASS_NAME": "CLASS_NAME",
+    "TAG": "TAG_NAME",
+    "TAG_NAME": "TAG_NAME",
+    "LINK_TEXT": "LINK_TEXT",
+    "PARTIAL_LINK_TEXT": "PARTIAL_LINK_TEXT",
+}
+
+# Every value substituted into a template is rendered with repr(), so quotes,
+# backslashes and newlines coming from the LLM can't break the generated code.
+HEADER_TEMPLATE = Template('''import logging
+from urllib.parse import urljoin
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.support.ui import Select
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, NoSuchElementException
+import requests
+import time
+$page_imports
+logging.basicConfig(level=logging.INFO)
+
+BASE_URL = $base_url
+
+
+# `driver` is a session-scoped fixture from the suite's conftest.py; `wait` is per-test and clears cookies
+def test_case(driver, wait):
+    driver.get(BASE_URL)
+
+''')
+
+PAGE_IMPORT_TEMPLATE = Template("from pages.$module import $class_name\n")
+
+EMPTY_PLAN_STEP = "    # No actions/assertions generated by Gemini. Add steps manually here.\n\n"
+
+ACTION_TEMPLATES: Dict[str, Template] = {
+    "input": Template('''    try:
+        elem = wait.until(EC.visibility_of_element_located($target))
+        elem.clear()
+        elem.send_keys($value)
+        logging.info('Typed %r into %s', $value, $label)
+        time.sleep(2)
+    except TimeoutException:
+        logging.error('Input element %s not found.', $label)
+
+'''),
+    "click": Template('''    try:
+        elem = wait.until(EC.element_to_be_clickable($target))
+        elem.click()
+        logging.info('Clicked %s', $label)
+        time.sleep(2)
+    except TimeoutException:
+        logging.error('Clickable element %s not found.', $label)
+
+'''),
+    "select": Template('''    try:
+        select = Select(wait.until(EC.visibility_of_element_located($target)))
+        try:
+            select.select_by_visible_text($value)
+        except NoSuchElementException:
+            select.select_by_value($value)
+        logging.info('Selected %r in %s', $value, $label)
+        time.sleep(2)
+    except (TimeoutException, NoSuchElementException):
+        logging.error('Select option %r in %s not found.', $value, $label)
+
+'''),
+    "hover": Template('''    try:
+        elem = wait.until(EC.visibility_of_element_located($target))
+        ActionChains(driver).move_to_element(elem).perform()
+        logging.info('Hovered over %s', $label)
+        time.sleep(2)
+    except TimeoutException:
+        logging.error('Hover target %s not found.', $label)
+
+'''),
+    "navigate": Template('''    driver.get(urljoin(BASE_URL, $value))
+    logging.info('Navigated to %s', driver.current_url)
+    time.sleep(2)
+
+'''),
+    "wait_for_url": Template('''    try:
+        wait.until(EC.url_contains($value))
+        logging.info('URL contains %r', $value)
+    except TimeoutException:
+        logging.error('URL never contained %r (current: %s)', $value, driver.current_url)
+
+'''),
+}
+
+# Assertions are not wrapped in try/except: a failed check (AssertionError, or the
+# TimeoutException raised by `wait.until`) must fail the pytest test, not just log.
+ASSERTION_TEMPLATES: Dict[str, Template] = {
+    "text_present": Template('''    wait.until(
+        EC.text_to_be_present_in_element($target, $text),
+        'Text %r not found in element %s' % ($text, $label),
+    )
+    logging.info('Assertion passed: %r', $text)
+    time.sleep(2)
+
+'''),
+    "element_visible": Template('''    wait.until(EC.visibility_of_element_located($target), 'Element %s is not visible' % $label)
+    logging.info('Assertion passed: %s is visible', $label)
+
+'''),
+    "url_contains": Template('''    wait.until(EC.url_contains($text), 'URL does not contain %r' % ($text,))
+    logging.info('Assertion passed: URL contains %r', $text)
+
+'''),
+    "title_contains": Template('''    wait.until(EC.title_contains($text), 'Title does not contain %r' % ($text,))
+    logging.info('Assertion passed: title contains %r', $text)
+
+'''),
+    "api_response": Template('''    response = requests.request($method, urljoin(BASE_URL, $path), json=$payload, timeout=10)
+    assert response.status_code == $status_code, '%s %s returned %s' % ($method, $path, response.status_code)
+    assert $text in response.text, '%r not found in %s %s response' % ($text, $method, $path)
+    logging.info('Assertion passed: %s %s returned %s', $method, $path, response.status_code)
+
+'''),
+}
+
+# Action/assertion types that operate on a located element
+LOCATOR_STEPS = {"input", "click", "select", "hover", "text_present", "element_visible"}
+
+
+@lru_cache(maxsize=256)
+def normalize_locator_type(locator_type: str) -> Optional[str]:
+    """
+    Map an LLM-provided locator type (e.g. "css selector", "Id") to a `By` attribute name.
+    """
+    key = locator_type.strip().upper().replace(" ", "_").replace("-", "_")
+    return LOCATOR_TYPES.get(key)
+
+
+@lru_cache(maxsize=1)
+def load_api_endpoints(path: str = API_ENDPOINTS_FILE) -> Dict[str, Any]:
+    """
+    Load the "METHOD /path" -> request body schema map used for API assertions.
+    """
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error(f"Failed reading API endpoints file '{path}': {e}")
+        return {}
+
+
+def _sample_payload(schema: Any) -> Any:
+    """
+    Build a placeholder request body from an api_endpoints.json schema.
+    """
+    if isinstance(schema, dict):
+        return {key: _sample_payload(value) for key, value in schema.items()}
+    if isinstance(schema, list):
+        return [_sample_payload(item) for item in schema[:1]]
+    if schema == "integer":
+        return 1
+    if schema == "number":
+        return 1.0
+    if schema == "boolean":
+        return True
+    return "test"
+
+
+def _locator_fields(
+    locator_type: str,
+    locator_value: str,
+    page_index: Optional[PageLocatorIndex] = None,
+    used_pages: Optional[Set[Tuple[str, str]]] = None,
+) -> Optional[Dict[str, str]]:
+    by = normalize_locator_type(locator_type)
+    if not by or not locator_value:
+        return None
+
+    target = f"(By.{by}, {locator_value!r})"
+    label = f"{by}={locator_value}"
+    page_locator = page_index.get((by, locator_value)) if page_index else None
+    if page_locator is not None:
+        module, class_name, attr = page_locator
+        target = label = f"{class_name}.{attr}"
+        if used_pages is not None:
+            used_pages.add((module, class_name))
+    return {"target": target, "label": repr(label)}
+
+
+def render_action(
+    action: SeleniumAction,
+    page_index: Optional[PageLocatorIndex] = None,
+    used_pages: Optional[Set[Tuple[str, str]]] = None,
+) -> str:
+    """
+    Render one action as script lines, or "" if it is unsupported or incomplete.
+
+    Locators found in `page_index` are rendered as page-object attributes and the
+    page is recorded in `used_pages`.
+    """
+    template = ACTION_TEMPLATES.get(action.type)
+    if template is None:
+        logger.warning(f"Skipping unsupported action type: {action.type!r}")
+        return ""
+
+    fields = {"value": repr(action.value)}
+    if action.type in LOCATOR_STEPS:
+        locator = _locator_fields(action.locator_type, action.locator_value, page_index, used_pages)
+        if locator is None:
+            return ""
+        fields.update(locator)
+    elif not action.value:
+        return ""
+    return template.substitute(fields)
+
+
+def render_assertion(
+    assertion: SeleniumAssertion,
+    page_index: Optional[PageLocatorIndex] = None,
+    used_pages: Optional[Set[Tuple[str, str]]] = None,
+) -> str:
+    """
+    Render one assertion as script lines, or "" if it is unsupported or incomplete.
+    """
+    template = ASSERTION_TEMPLATES.get(assertion.type)
+    if template is None:
+        logger.warning(f"Skipping unsupported assertion type: {assertion.type!r}")
+        return ""
+
+    fields = {"text": repr(assertion.text)}
+    if assertion.type in LOCATOR_STEPS:
+        locator = _locator_fields(assertion.locator_type, assertion.locator_value, page_index, used_pages)
+        if locator is None:
+            return ""
+        fields.update(locator)
+    elif assertion.type == "api_response":
+        api_fields = _api_fields(assertion)
+        if api_fields is None:
+            return ""
+        fields.update(api_fields)
+    elif not assertion.text:
+        return ""
+    return template.substitute(fields)
+
+
+def _api_fields(assertion: SeleniumAssertion) -> Optional[Dict[str, str]]:
+    endpoint = " ".join(assertion.endpoint.split())
+    method, _, path = endpoint.partition(" ")
+    if not method or not path:
+        return None
+
+    endpoints = load_api_endpoints()
+    key = f"{method.upper()} {path}"
+    if endpoints and key not in endpoints:
+        logger.warning(f"Skipping API assertion for unknown endpoint: {key!r}")
+        return None
+
+    payload = assertion.payload
+    if payload is None and key in endpoints:
+        payload = _sample_payload(endpoints[key])
+    return {
+        "method": repr(method.upper()),
+        "path": repr(path),
+        "payload": repr(payload),
+        "status_code": repr(assertion.status_code or 200),
+    }
+
+
+def render_script(plan: ActionPlan, base_url: str, page_index: Optional[PageLocatorIndex] = None) -> str:
+    """
+    Render a complete pytest Selenium script for a plan.
+    """
+    used_pages: Set[Tuple[str, str]] = set()
+    steps = [render_action(action, page_index, used_pages) for action in plan.actions]
+    steps.extend(render_assertion(assertion, page_index, used_pages) for assertion in plan.assertions)
+    steps = [step for step in steps if step]
+
+    page_imports = "".join(
+        PAGE_IMPORT_TEMPLATE.substitute(module=module, class_name=class_name)
+        for module, class_name in sorted(used_pages)
+    )
+    parts = [HEADER_TEMPLATE.substitute(base_url=repr(base_url), page_imports=page_imports)]
+    parts.extend(steps or [EMPTY_PLAN_STEP])
+    return "".join(parts).rstrip() + "\n"
+
+
+def check_syntax(script: str, filename: str = "<selenium_script>") -> None:
+    """
+    Raise ValueError if the generated script is not valid Python.
+    """
+    try:
+        compile(script, filename, "exec")
+    except SyntaxError as e:
+        raise ValueError(f"Generated Selenium script has invalid syntax at line {e.lineno}: {e.msg}") from e
@@ -2,40 +2,43 @@ import requests
 import os
 import logging
 import json
-import re
-from typing import Optional, Dict, Any
+from typing import List, Optional
+
+from models.test_cases import ActionPlan
+from utils.json_parser import extract_json, parse_action_plan
+from utils.metrics import record_llm_usage
+from utils.page_objects import PageObject, build_locator_index, load_page_objects
+from utils.script_templates import check_syntax, load_api_endpoints, render_script
+from utils.tracing import span
 
 logging.basicConfig(level=logging.INFO)
 
 # Get Gemini API key
 api_key = os.getenv("GEMINI_API_KEY")
 
-# Gemini API endpoint
-GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent"
-
-def extract_json(text: str) -> Dict[str, Any]:
-    """
-    Extract the FIRST valid JSON object from text, even if extra content exists.
-    """
-    # Match the first JSON block using a robust regex pattern for balanced braces
-    match = re.search(r"\{(?:[^{}]|(?:\{[^{}]*\}))*\}", text, re.DOTALL)
-    if not match:
-        return {"actions": [], "assertions": []}
-
-    json_str = match.group(0)
-
-    try:
-        return json.loads(json_str)
-    except json.JSONDecodeError:
-        return {"actions": [], "assertions": []}
-
-def call_gemini_api(test_case_title: str, test_case_description: str) -> Dict[str, Any]:
+# Gemini API endpoint; override to point at a Gemini-compatible server, e.g. the local stub in llm_stub.py
+GEMINI_API_URL = os.getenv(
+    "GEMINI_API_URL",
+    "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent",
+)
+
+def call_gemini_api(
+    test_case_title: str,
+    test_case_description: str,
+    page_objects: Optional[List[PageObject]] = None,
+) -> ActionPlan:
     """
-    Call Gemini API and return structured JSON (actions + assertions).
+    Call Gemini API and return a validated action/assertion plan.
     """
     if not api_key:
         logging.warning("GEMINI_API_KEY is not set.")
-        return {"actions": [], "assertions": []}
+        return ActionPlan()
+
+    api_endpoints = ", ".join(load_api_endpoints()) or "none"
+    page_locators = "\n".join(
+        f"- {page.source}: " + ", ".join(f"{loc.by.lower()}={loc.value}" for loc in page.locators)
+        for page in page_objects or []
+    ) or "none"
 
     prompt_text = f"""
 You are a QA test case generator.
@@ -44,6 +47,18 @@ Generate a STRICT JSON object with two keys:
 - "actions": list of action objects,
 - "assertions": list of assertion objects.
 
+Each action object has: "type", "locator_type" (e.g. "id", "name", "css_selector", "xpath"),
+"locator_value" and "value".
+Action types: "input", "click", "select" (value = option text), "hover",
+"navigate" (value = relative URL, no locator), "wait_for_url" (value = URL fragment, no locator).
+
+Each assertion object has: "type", "locator_type", "locator_value" and "text".
+Assertion types: "text_present", "element_visible", "url_contains" (no locator), "title_contains" (no locator),
+"api_response" (no locator; add "endpoint" as "METHOD /path", "status_code" and optional "payload").
+Available API endpoints: {api_endpoints}
+Known page locators (prefer these exact locator types and values):
+{page_locators}
+
 Rules:
 - Return ONLY valid JSON (UTF-8).
 - NO markdown.
@@ -73,21 +88,23 @@ Test case description: {test_case_description}
     }
 
     try:
-        response = requests.post(GEMINI_API_URL, headers=headers, json=payload, timeout=30)
-        response.raise_for_status()
+        with span("llm_call", caller="selenium"):
+            response = requests.post(GEMINI_API_URL, headers=headers, json=payload, timeout=30)
+            response.raise_for_status()
     except Exception as e:
         logging.error(f"Gemini API call failed: {e}")
-        return {"actions": [], "assertions": []}
+        return ActionPlan()
 
     try:
         data = response.json()
     except json.JSONDecodeError:
         logging.error("Gemini response is not valid JSON.")
-        return {"actions": [], "assertions": []}
+        return ActionPlan()
 
+    record_llm_usage("selenium", data)
     candidates = data.get("candidates", [])
     if not candidates:
-        return {"actions": [], "assertions": []}
+        return ActionPlan()
 
     content = candidates[0].get("content", "")
     raw_text = ""
@@ -97,113 +114,29 @@ Test case description: {test_case_description}
     else:
         raw_text = str(content)
 
-    return extract_json(raw_text)
+    return parse_action_plan(extract_json(raw_text, default={}))
 
 def generate_selenium_script(
     test_case: str,
     html_code: str,
-    base_url: Optional[str] = "http://localhost:8501"
+    base_url: Optional[str] = "http://localhost:8501",
+    html_dir: str = "uploaded_html",
 ) -> str:
     """
-    Generate Selenium test script using Gemini structured output.
+    Generate a pytest Selenium test script using Gemini structured output.
+
+    Locators that belong to an uploaded page are referenced through its page
+    object (see generate_suite_support) instead of being repeated inline.
     """
+    page_objects = load_page_objects(html_dir)
 
     try:
-        gemini_response = call_gemini_api(test_case, html_code)
+        gemini_response = call_gemini_api(test_case, html_code, page_objects)
     except Exception as e:
         logging.warning(f"Gemini API call failed: {e}")
-        gemini_response = {"actions": [], "assertions": []}
-
-    script = [
-        "import logging",
-        "from selenium import webdriver",
-        "from selenium.webdriver.common.by import By",
-        "from selenium.webdriver.support.ui import WebDriverWait",
-        "from selenium.webdriver.support import expected_conditions as EC",
-        "from selenium.common.exceptions import TimeoutException",
-        "from selenium.webdriver.chrome.service import Service",
-        "from webdriver_manager.chrome import ChromeDriverManager",
-        "import time",
-        "",
-        "logging.basicConfig(level=logging.INFO)",
-        "",
-        "def test_case():",
-        "    service = Service(ChromeDriverManager().install())",
-        "    driver = webdriver.Chrome(service=service)",
-        "    wait = WebDriverWait(driver, 10)",
-        "    try:",
-        f"        driver.get('{base_url}')",
-        ""
-    ]
-
-    # Build actions
-    for action in gemini_response.get("actions", []):
-        loc_type = action.get("locator_type", "").upper()
-        loc_value = action.get("locator_value", "")
-        action_type = action.get("type", "")
-        value = action.get("value", "")
-
-        if not loc_type or not loc_value or not action_type:
-            continue
-
-        if action_type == "input":
-            script.extend([
-                "        try:",
-                f"            elem = wait.until(EC.visibility_of_element_located((By.{loc_type}, '{loc_value}')))",
-                "            elem.clear()",
-                f"            elem.send_keys('{value}')",
-                f"            logging.info('Typed \"{value}\" into {loc_type}={loc_value}')",
-                "            time.sleep(2)",
-                "        except TimeoutException:",
-                f"            logging.error('Input element {loc_type}={loc_value} not found.')",
-                ""
-            ])
-
-        elif action_type == "click":
-            script.extend([
-                "        try:",
-                f"            elem = wait.until(EC.element_to_be_clickable((By.{loc_type}, '{loc_value}')))",
-                "            elem.click()",
-                f"            logging.info('Clicked {loc_type}={loc_value}')",
-                "            time.sleep(2)",
-                "        except TimeoutException:",
-                f"            logging.error('Clickable element {loc_type}={loc_value} not found.')",
-                ""
-            ])
-
-    # Build assertions
-    for assertion in gemini_response.get("assertions", []):
-        loc_type = assertion.get("locator_type", "").upper()
-        loc_value = assertion.get("locator_value", "")
-        a_type = assertion.get("type", "")
-        text = assertion.get("text", "")
-
-        if not loc_type or not loc_value or not a_type:
-            continue
-
-        if a_type == "text_present":
-            script.extend([
-                "        try:",
-                f"            condition = wait.until(EC.text_to_be_present_in_element((By.{loc_type}, '{loc_value}'), '{text}'))",
-                f"            assert condition, 'Text \"{text}\" not found in element {loc_type}={loc_value}'",
-                f"            logging.info('Assertion passed: {text}')",
-                "            time.sleep(2)",
-                "        except Exception as e:",
-                "            logging.error(f'Assertion failed: {e}')",
-                ""
-            ])
-
-    # Fallback if nothing generated
-    if not gemini_response.get("actions") and not gemini_response.get("assertions"):
-        script.append("        # No actions/assertions generated by Gemini. Add steps manually here.\n")
-
-    # Closing block
-    script.extend([
-        "    finally:",
-        "        driver.quit()",
-        "",
-        "if __name__ == '__main__':",
-        "    test_case()",
-    ])
-
-    return "\n".join(script)
+        gemini_response = ActionPlan()
+
+    with span("selenium_render", actions=len(gemini_response.actions), assertions=len(gemini_response.assertions)):
+        script = render_script(gemini_response, base_url, build_locator_index(page_objects))
+        check_syntax(script)
+    return script
@@ -0,0 +1,98 @@
+import logging
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from pydantic import BaseModel, Field
+
+from utils.metrics import STAGE_ERRORS, STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Number of finished request traces kept for /debug/traces
+MAX_RECENT_TRACES = 100
+
+
+class Span(BaseModel):
+    name: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start: float
+    duration: Optional[float] = None
+    error: Optional[str] = None
+    attributes: Dict[str, Any] = Field(default_factory=dict)
+
+
+class Trace(BaseModel):
+    trace_id: str
+    name: str
+    start: float
+    duration: Optional[float] = None
+    spans: List[Span] = Field(default_factory=list)
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+RECENT_TRACES: Deque[Trace] = deque(maxlen=MAX_RECENT_TRACES)
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def trace_request(name: str) -> Iterator[Trace]:
+    """
+    Start a request-scoped trace; spans opened inside it (in this context) are attached to it.
+    """
+    trace = Trace(trace_id=uuid.uuid4().hex, name=name, start=time.time())
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(None)
+    started = time.perf_counter()
+    try:
+        yield trace
+    finally:
+        trace.duration = time.perf_counter() - started
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        RECENT_TRACES.append(trace)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """
+    Time a pipeline stage. The duration is always recorded in the stage histogram and,
+    inside a request trace, the span is attached to that trace under the current span.
+    """
+    parent = _current_span.get()
+    current = Span(
+        name=name,
+        span_id=_new_id(),
+        parent_id=parent.span_id if parent else None,
+        start=time.time(),
+        attributes=attributes,
+    )
+    token = _current_span.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except Exception as e:
+        current.error = f"{type(e).__name__}: {e}"
+        STAGE_ERRORS.inc(stage=name)
+        raise
+    finally:
+        current.duration = time.perf_counter() - started
+        _current_span.reset(token)
+        STAGE_SECONDS.observe(current.duration, stage=name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.spans.append(current)
+        logger.debug(f"span {name} took {current.duration * 1000:.1f} ms")
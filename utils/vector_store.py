@@ -0,0 +1,333 @@
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from utils.tracing import span
+
+try:
+    import faiss
+except ImportError:  # FAISS is optional; the in-process store falls back to NumPy brute force
+    faiss = None
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; writes are then only serialized within a process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+# "chroma" (LangChain Chroma on SQLite) or "inprocess" (mmap'd flat index, FAISS HNSW when large)
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "chroma")
+DEFAULT_PERSIST_DIRS = {"chroma": "chroma_store", "inprocess": "vector_index"}
+
+# Below this many vectors a brute-force matrix product beats building/querying an HNSW graph
+FAISS_MIN_VECTORS = int(os.getenv("FAISS_MIN_VECTORS", "50000"))
+
+
+class TracedEmbeddings(Embeddings):
+    """
+    Wraps an embedding model so document and query embedding show up as traced stages.
+    """
+
+    def __init__(self, model: Embeddings):
+        self.model = model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with span("embedding", kind="documents", count=len(texts)):
+            return self.model.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        with span("embedding", kind="query"):
+            return self.model.embed_query(text)
+
+
+@lru_cache(maxsize=1)
+def get_embeddings() -> Embeddings:
+    """
+    Shared embedding model, loaded once per process.
+    """
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+
+    return TracedEmbeddings(HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME))
+
+
+class VectorStore(ABC):
+    """
+    Minimal vector index interface used by the knowledge base and retrieval.
+    """
+
+    # Written next to the index on every write, so caches keyed on the revision are
+    # invalidated by a rebuild in any worker process, not just the one that wrote
+    REVISION_FILE = "revision"
+
+    def __init__(self, embedding: Embeddings, persist_dir: str):
+        self.embedding = embedding
+        self.persist_dir = persist_dir
+        # ((inode, mtime) of the revision file, its contents); re-read only when the file changes
+        self._revision_cache: Tuple[Optional[Tuple[int, int]], str] = (None, "")
+        os.makedirs(persist_dir, exist_ok=True)
+
+    @property
+    def revision(self) -> str:
+        path = os.path.join(self.persist_dir, self.REVISION_FILE)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return ""
+        stamp = (stat.st_ino, stat.st_mtime_ns)
+        cached_stamp, revision = self._revision_cache
+        if stamp != cached_stamp:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    revision = f.read().strip()
+            except FileNotFoundError:
+                return ""
+            self._revision_cache = (stamp, revision)
+        return revision
+
+    def _bump_revision(self) -> None:
+        path = os.path.join(self.persist_dir, self.REVISION_FILE)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(f"{time.time_ns()}-{os.getpid()}")
+        os.replace(tmp_path, path)
+
+    @abstractmethod
+    def add_texts(self, texts: List[str], metadatas: Optional[List[Dict]] = None) -> None:
+        ...
+
+    @abstractmethod
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4) -> List[Document]:
+        ...
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+        return self.similarity_search_by_vector(self.embedding.embed_query(query), k)
+
+    def persist(self) -> None:
+        pass
+
+
+class ChromaVectorStore(VectorStore):
+    """
+    LangChain Chroma collection persisted in `persist_dir`.
+    """
+
+    def __init__(self, embedding: Embeddings, persist_dir: str):
+        from langchain_community.vectorstores import Chroma
+
+        super().__init__(embedding, persist_dir)
+        self.db = Chroma(persist_directory=persist_dir, embedding_function=embedding)
+
+    def add_texts(self, texts: List[str], metadatas: Optional[List[Dict]] = None) -> None:
+        self.db.add_texts(texts=texts, metadatas=metadatas)
+        self._bump_revision()
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4) -> List[Document]:
+        return self.db.similarity_search_by_vector(embedding, k=k)
+
+    def count(self) -> int:
+        return self.db._collection.count()
+
+    def persist(self) -> None:
+        self.db.persist()
+
+
+class InProcessVectorStore(VectorStore):
+    """
+    Flat cosine-similarity index kept in `persist_dir` as a memory-mapped .npy matrix
+    plus a JSON file of texts and metadata. Searched by NumPy brute force, or by a
+    FAISS HNSW graph once the index has at least `faiss_min_vectors` vectors.
+    """
+
+    VECTORS_FILE = "vectors.npy"
+    DOCUMENTS_FILE = "documents.json"
+    HNSW_FILE = "hnsw.faiss"
+    LOCK_FILE = "write.lock"
+
+    def __init__(self, embedding: Embeddings, persist_dir: str, faiss_min_vectors: int = FAISS_MIN_VECTORS):
+        super().__init__(embedding, persist_dir)
+        self.faiss_min_vectors = faiss_min_vectors
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None
+        self._documents: List[Tuple[str, Dict]] = []
+        self._hnsw = None
+        # (inode, mtime) of the index files as last loaded; another process rebuilding the index changes them
+        self._loaded_signature: Optional[Tuple[int, ...]] = None
+        self._load()
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.persist_dir, filename)
+
+    def _tmp_path(self, filename: str) -> str:
+        # Per-process temp names, so concurrent writers never share a half-written file
+        return self._path(f"{filename}.{os.getpid()}.tmp")
+
+    def _signature(self) -> Optional[Tuple[int, ...]]:
+        try:
+            vectors = os.stat(self._path(self.VECTORS_FILE))
+            documents = os.stat(self._path(self.DOCUMENTS_FILE))
+        except FileNotFoundError:
+            return None
+        # os.replace gives each rebuild a new inode, even within the mtime resolution
+        return vectors.st_ino, vectors.st_mtime_ns, documents.st_ino, documents.st_mtime_ns
+
+    @contextmanager
+    def _write_lock(self):
+        """
+        Serialize writers across threads and, via flock on a lock file, across worker processes.
+        """
+        with self._lock, open(self._path(self.LOCK_FILE), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load(self) -> None:
+        signature = self._signature()
+        if signature is None:
+            return
+        vectors = np.load(self._path(self.VECTORS_FILE), mmap_mode="r")
+        with open(self._path(self.DOCUMENTS_FILE), "r", encoding="utf-8") as f:
+            documents = [(doc["text"], doc["metadata"]) for doc in json.load(f)]
+        if len(documents) != len(vectors):
+            # Possibly caught between another writer's two file swaps; retried on the next search
+            logger.warning(f"Vector index in '{self.persist_dir}' is inconsistent; keeping the previous one.")
+            return
+        self._vectors, self._documents = vectors, documents
+        self._hnsw = None
+        self._loaded_signature = signature
+
+    def _reload_if_changed(self) -> None:
+        """
+        Pick up an index rebuilt by another worker process. Caller holds `self._lock`.
+        """
+        signature = self._signature()
+        if signature is not None and signature != self._loaded_signature:
+            logger.info(f"Vector index in '{self.persist_dir}' changed on disk; reloading.")
+            self._load()
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def add_texts(self, texts: List[str], metadatas: Optional[List[Dict]] = None) -> None:
+        if not texts:
+            return
+        metadatas = metadatas or [{} for _ in texts]
+        new_vectors = self._normalize(np.asarray(self.embedding.embed_documents(texts), dtype=np.float32))
+
+        with self._write_lock():
+            # Append to the latest index on disk, which another worker may have just written
+            self._load()
+            vectors = new_vectors if self._vectors is None else np.concatenate([self._vectors, new_vectors])
+            documents = self._documents + list(zip(texts, metadatas))
+
+            # Write to temp files and swap in, so readers never see a half-written index
+            tmp_vectors = self._tmp_path(self.VECTORS_FILE)
+            with open(tmp_vectors, "wb") as f:
+                np.save(f, vectors)
+            tmp_documents = self._tmp_path(self.DOCUMENTS_FILE)
+            with open(tmp_documents, "w", encoding="utf-8") as f:
+                json.dump([{"text": text, "metadata": meta} for text, meta in documents], f)
+            os.replace(tmp_vectors, self._path(self.VECTORS_FILE))
+            os.replace(tmp_documents, self._path(self.DOCUMENTS_FILE))
+
+            self._hnsw = None
+            if os.path.exists(self._path(self.HNSW_FILE)):
+                os.remove(self._path(self.HNSW_FILE))
+            self._load()
+            self._bump_revision()
+
+    def _hnsw_index(self):
+        """
+        Load or build the FAISS HNSW graph for large indexes; None means use brute force.
+        """
+        if faiss is None or self._vectors is None or len(self._vectors) < self.faiss_min_vectors:
+            return None
+        if self._hnsw is not None:
+            return self._hnsw
+
+        hnsw_path = self._path(self.HNSW_FILE)
+        if os.path.exists(hnsw_path):
+            index = faiss.read_index(hnsw_path)
+            if index.ntotal == len(self._vectors):
+                self._hnsw = index
+                return index
+
+        logger.info(f"Building HNSW index over {len(self._vectors)} vectors.")
+        index = faiss.IndexHNSWFlat(self._vectors.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+        index.add(np.ascontiguousarray(self._vectors))
+        tmp_hnsw = self._tmp_path(self.HNSW_FILE)
+        faiss.write_index(index, tmp_hnsw)
+        os.replace(tmp_hnsw, hnsw_path)
+        self._hnsw = index
+        return index
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4) -> List[Document]:
+        with self._lock:
+            self._reload_if_changed()
+            vectors, documents = self._vectors, self._documents
+            hnsw = self._hnsw_index()
+        if vectors is None or not documents:
+            return []
+
+        query = self._normalize(np.asarray(embedding, dtype=np.float32))
+        k = min(k, len(documents))
+        if hnsw is not None:
+            _, ids = hnsw.search(query.reshape(1, -1), k)
+            top = [i for i in ids[0] if i >= 0]
+        else:
+            scores = vectors @ query
+            top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+            top = top[np.argsort(-scores[top])]
+
+        return [Document(page_content=documents[i][0], metadata=documents[i][1]) for i in top]
+
+    def count(self) -> int:
+        with self._lock:
+            self._reload_if_changed()
+            return 0 if self._vectors is None else len(self._vectors)
+
+
+_stores: Dict[Tuple[str, str], VectorStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_vector_store(persist_dir: Optional[str] = None, backend: Optional[str] = None) -> VectorStore:
+    """
+    Return the process-wide vector store for a backend and directory, creating it on first use.
+    """
+    backend = backend or VECTOR_STORE_BACKEND
+    if backend not in DEFAULT_PERSIST_DIRS:
+        raise ValueError(f"Unknown vector store backend: {backend!r}")
+    persist_dir = persist_dir or DEFAULT_PERSIST_DIRS[backend]
+
+    with _stores_lock:
+        store = _stores.get((backend, persist_dir))
+        if store is None:
+            if backend == "chroma":
+                store = ChromaVectorStore(get_embeddings(), persist_dir)
+            else:
+                store = InProcessVectorStore(get_embeddings(), persist_dir)
+            _stores[(backend, persist_dir)] = store
+        return store